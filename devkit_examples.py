@@ -16,8 +16,11 @@ Features:
 - Price validation
 - Historical data
 - Update frequency control
+- Batched updates in a single AI call
 """
 
+import json
+
 from genlayer import *
 
 class MultiTokenOracle(gl.Contract):
@@ -32,8 +35,7 @@ class MultiTokenOracle(gl.Contract):
         """Update price for a specific token"""
         
         # Check if update needed
-        last = self.last_update.get(token, 0)
-        if gl.block_timestamp - last < self.update_interval:
+        if not self._needs_update(token):
             return self.prices.get(token, 0)
         
         # Fetch price via AI from multiple sources
@@ -46,27 +48,50 @@ Return only the median price as an integer (no decimals, no text)."""
         
         price_str = gl.eq_principle_strict_eq(fetch)
         
-        try:
+        ok, result = self._try_store_price(token, price_str)
+        if not ok:
+            raise Exception(result)
+        return result
+    
+    def _needs_update(self, token: str) -> bool:
+        """Check whether the cached price is older than the update interval"""
+        last = self.last_update.get(token, 0)
+        return gl.block_timestamp - last >= self.update_interval
+    
+    def _try_store_price(self, token: str, price_str) -> tuple:
+        """Validate a fetched price and store it.
+        
+        Returns (True, price) on success or (False, reason) without raising.
+        """
+        
+        if isinstance(price_str, str):
+            try:
+                price = int(price_str.strip())
+            except ValueError:
+                return False, "Invalid price format from AI"
+        elif isinstance(price_str, int) and not isinstance(price_str, bool):
+            price = price_str
+        elif isinstance(price_str, float) and price_str.is_integer():
             price = int(price_str)
-        except:
-            raise Exception("Invalid price format from AI")
+        else:
+            return False, "Invalid price format from AI"
         
         # Validate price is reasonable
         if price <= 0:
-            raise Exception("Price must be positive")
+            return False, "Price must be positive"
         
         # Check for extreme changes (>50% in one update)
         if token in self.prices:
             old_price = self.prices[token]
             change = abs(price - old_price) / old_price
             if change > 0.5:
-                raise Exception("Price change too extreme, possible error")
+                return False, "Price change too extreme, possible error"
         
         # Store price
         self.prices[token] = price
         self.last_update[token] = gl.block_timestamp
         
-        return price
+        return True, price
     
     @gl.public.view
     def get_price(self, token: str) -> int:
@@ -78,16 +103,44 @@ Return only the median price as an integer (no decimals, no text)."""
         """Get timestamp of last price update"""
         return self.last_update.get(token, 0)
     
+    def _batch_prompt(self, tokens: list) -> str:
+        """Build one prompt for several tokens (static instructions first)"""
+        return f"""Return a JSON object mapping each token to its median price in USD.
+Use these sources: {self.trusted_sources}
+Prices must be integers (no decimals, no text). Return only the JSON object, e.g. {{"BTC": 45000}}.
+
+Tokens: {tokens}"""
+    
     @gl.public.write
     def batch_update(self, tokens: list) -> dict:
-        """Update prices for multiple tokens"""
+        """Update prices for multiple tokens with a single AI call"""
         results = {}
+        stale = []
         for token in tokens:
-            try:
-                price = self.update_price(token)
-                results[token] = price
-            except Exception as e:
-                results[token] = f"Error: {str(e)}"
+            if self._needs_update(token):
+                results[token] = None
+                stale.append(token)
+            else:
+                results[token] = self.prices.get(token, 0)
+        
+        if not stale:
+            return results
+        
+        prompt = self._batch_prompt(stale)
+        
+        def fetch():
+            return gl.exec_prompt(prompt)
+        
+        try:
+            fetched = json.loads(gl.eq_principle_strict_eq(fetch))
+        except (TypeError, ValueError):
+            fetched = {}
+        if not isinstance(fetched, dict):
+            fetched = {}
+        
+        for token in stale:
+            ok, result = self._try_store_price(token, fetched.get(token))
+            results[token] = result if ok else f"Error: {result}"
         return results
 '''
 
@@ -109,9 +162,15 @@ from genlayer import *
 class WeatherInsurance(gl.Contract):
     def __init__(self):
         self.policies = {}
+        self.policies_by_owner = {}  # owner -> [policy_id]
         self.policy_counter = 0
+        self.active_policy_count = 0
         self.claims = {}
         self.total_payouts = 0
+        self.weather_cache = {}  # "location|date|trigger" -> approved weather report
+        self.weather_cached_at = {}  # same key -> block timestamp
+        self.weather_cache_ttl = 30 * 86400  # 30 days
+        self.weather_cache_max = 1000
     
     @gl.public.write
     def create_policy(self, location: str, event_date: str, 
@@ -128,9 +187,10 @@ class WeatherInsurance(gl.Contract):
         
         self.policy_counter += 1
         policy_id = f"POL-{self.policy_counter:04d}"
+        owner = gl.message_sender_address
         
         self.policies[policy_id] = {
-            "owner": gl.message_sender_address,
+            "owner": owner,
             "location": location,
             "event_date": event_date,
             "trigger": trigger_condition,
@@ -138,6 +198,8 @@ class WeatherInsurance(gl.Contract):
             "status": "active",
             "created_at": gl.block_timestamp
         }
+        self.policies_by_owner.setdefault(owner, []).append(policy_id)
+        self.active_policy_count += 1
         
         return policy_id
     
@@ -156,8 +218,13 @@ class WeatherInsurance(gl.Contract):
         if policy["owner"] != gl.message_sender_address:
             return "ERROR: Only policy owner can file claims"
         
-        # Check weather conditions via AI
-        prompt = f"""Check weather for {policy['location']} on {policy['event_date']}.
+        # Reuse an approved report for the same location, date and condition
+        key = f"{policy['location']}|{policy['event_date']}|{policy['trigger']}"
+        weather_report = self._cached_weather(key)
+        
+        if weather_report is None:
+            # Check weather conditions via AI
+            prompt = f"""Check weather for {policy['location']} on {policy['event_date']}.
 
 Condition to verify: {policy['trigger']}
 
@@ -165,16 +232,21 @@ Return format:
 WEATHER: [actual conditions]
 CONDITION_MET: YES or NO
 CONFIDENCE: [0-100]%"""
-        
-        def check_weather():
-            return gl.exec_prompt(prompt)
-        
-        weather_report = gl.eq_principle_strict_eq(check_weather)
+            
+            def check_weather():
+                return gl.exec_prompt(prompt)
+            
+            weather_report = gl.eq_principle_strict_eq(check_weather)
+            
+            # Only a met condition is final; denials are re-checked per claim
+            if "CONDITION_MET: YES" in weather_report:
+                self._store_weather(key, weather_report)
         
         # Parse result
         if "CONDITION_MET: YES" in weather_report:
             # Approve claim
             policy["status"] = "claimed"
+            self.active_policy_count -= 1
             policy["payout"] = policy["coverage"]
             policy["weather_report"] = weather_report
             
@@ -198,6 +270,7 @@ Weather Report:
         else:
             # Deny claim
             policy["status"] = "denied"
+            self.active_policy_count -= 1
             
             return f"""❌ CLAIM DENIED
 
@@ -208,6 +281,32 @@ Weather Report:
 
 Trigger condition was not met."""
     
+    def _cached_weather(self, key: str):
+        """Get a cached weather report, evicting it if older than the TTL"""
+        if key not in self.weather_cache:
+            return None
+        
+        if gl.block_timestamp - self.weather_cached_at[key] > self.weather_cache_ttl:
+            del self.weather_cache[key]
+            del self.weather_cached_at[key]
+            return None
+        
+        return self.weather_cache[key]
+    
+    def _store_weather(self, key: str, weather_report: str):
+        """Cache a weather report, dropping expired or excess entries first"""
+        # Keys are only inserted after a miss, so the oldest one comes first
+        while self.weather_cached_at:
+            oldest = next(iter(self.weather_cached_at))
+            expired = gl.block_timestamp - self.weather_cached_at[oldest] > self.weather_cache_ttl
+            if not expired and len(self.weather_cache) < self.weather_cache_max:
+                break
+            del self.weather_cache[oldest]
+            del self.weather_cached_at[oldest]
+        
+        self.weather_cache[key] = weather_report
+        self.weather_cached_at[key] = gl.block_timestamp
+    
     @gl.public.view
     def get_policy(self, policy_id: str) -> dict:
         """View policy details"""
@@ -219,15 +318,15 @@ Trigger condition was not met."""
         owner = gl.message_sender_address
         my_policies = []
         
-        for policy_id, policy in self.policies.items():
-            if policy["owner"] == owner:
-                my_policies.append({
-                    "id": policy_id,
-                    "location": policy["location"],
-                    "date": policy["event_date"],
-                    "coverage": policy["coverage"],
-                    "status": policy["status"]
-                })
+        for policy_id in self.policies_by_owner.get(owner, []):
+            policy = self.policies[policy_id]
+            my_policies.append({
+                "id": policy_id,
+                "location": policy["location"],
+                "date": policy["event_date"],
+                "coverage": policy["coverage"],
+                "status": policy["status"]
+            })
         
         return my_policies
     
@@ -236,7 +335,7 @@ Trigger condition was not met."""
         """Get contract statistics"""
         return {
             "total_policies": self.policy_counter,
-            "active_policies": len([p for p in self.policies.values() if p["status"] == "active"]),
+            "active_policies": self.active_policy_count,
             "total_claims": len(self.claims),
             "total_payouts": self.total_payouts
         }
@@ -365,6 +464,7 @@ class SimpleDAO(gl.Contract):
     def __init__(self):
         self.members = {}  # address -> voting power
         self.proposals = {}
+        self.active_proposals = {}  # proposal_id -> True, in creation order
         self.proposal_counter = 0
         self.voting_period = 86400  # 1 day in seconds
     
@@ -405,6 +505,7 @@ class SimpleDAO(gl.Contract):
             "voters": {},
             "status": "active"
         }
+        self.active_proposals[proposal_id] = True
         
         return f"✅ Proposal created: {proposal_id}"
     
@@ -465,6 +566,8 @@ class SimpleDAO(gl.Contract):
             proposal["status"] = "rejected"
             result = "REJECTED ❌"
         
+        self.active_proposals.pop(proposal_id, None)
+        
         return f"""Proposal {proposal_id}: {result}
 
 Votes FOR: {proposal['votes_for']}
@@ -480,15 +583,15 @@ Total voters: {len(proposal['voters'])}"""
     def list_active_proposals(self) -> list:
         """List all active proposals"""
         active = []
-        for prop_id, prop in self.proposals.items():
-            if prop["status"] == "active":
-                active.append({
-                    "id": prop_id,
-                    "title": prop["title"],
-                    "votes_for": prop["votes_for"],
-                    "votes_against": prop["votes_against"],
-                    "ends_in": prop["end_time"] - gl.block_timestamp
-                })
+        for prop_id in self.active_proposals:
+            prop = self.proposals[prop_id]
+            active.append({
+                "id": prop_id,
+                "title": prop["title"],
+                "votes_for": prop["votes_for"],
+                "votes_against": prop["votes_against"],
+                "ends_in": prop["end_time"] - gl.block_timestamp
+            })
         return active
 '''
 
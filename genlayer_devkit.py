@@ -17,13 +17,21 @@ Author: HASBUNALLAH AYO ABDULRAHMAN
 
 import click
 import os
-import json
-import subprocess
+import re
+import sys
 from pathlib import Path
 
 # Version
 VERSION = "1.0.0"
 
+# Required contract elements, matched in a single pass over the source
+CHECK_PATTERN = re.compile(rb'(gl\.Contract)|(@gl\.public)|(def __init__)')
+CHECKS = [
+    'Inherits from gl.Contract',
+    'Has public methods',
+    'Has constructor'
+]
+
 # Colors for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -48,6 +56,145 @@ def print_warning(msg):
     click.echo(f"{Colors.YELLOW}⚠{Colors.ENDC} {msg}")
 
 
+# Contract templates for `generate`; `{name}` is replaced with the contract name
+TEMPLATES = {
+    'basic': {
+        'description': 'Basic contract with storage',
+        'code': '''# { "Depends": "py-genlayer:test" }
+from genlayer import *
+
+class {name}(gl.Contract):
+    def __init__(self):
+        self.data = {}
+    
+    @gl.public.write
+    def store(self, key: str, value: str):
+        self.data[key] = value
+        return f"Stored: {key} = {value}"
+    
+    @gl.public.view
+    def retrieve(self, key: str) -> str:
+        return self.data.get(key, "Not found")
+'''
+    },
+    'oracle': {
+        'description': 'Price oracle with AI integration',
+        'code': '''# { "Depends": "py-genlayer:test" }
+from genlayer import *
+
+class {name}(gl.Contract):
+    def __init__(self):
+        self.prices = {}
+        self.last_update = 0
+    
+    @gl.public.write
+    def fetch_price(self, token: str) -> int:
+        """Fetch token price using AI"""
+        
+        prompt = f"Get current price for {token} in USD"
+        
+        def get_price():
+            return gl.exec_prompt(prompt)
+        
+        price_str = gl.eq_principle_strict_eq(get_price)
+        price = int(price_str)
+        
+        self.prices[token] = price
+        self.last_update = gl.block_timestamp
+        
+        return price
+    
+    @gl.public.view
+    def get_price(self, token: str) -> int:
+        return self.prices.get(token, 0)
+'''
+    },
+    'insurance': {
+        'description': 'Weather-based insurance contract',
+        'code': '''# { "Depends": "py-genlayer:test" }
+from genlayer import *
+
+class {name}(gl.Contract):
+    def __init__(self):
+        self.policies = {}
+        self.policy_counter = 0
+    
+    @gl.public.write
+    def create_policy(self, location: str, coverage: int) -> str:
+        self.policy_counter += 1
+        policy_id = f"POL-{self.policy_counter}"
+        
+        self.policies[policy_id] = {
+            "location": location,
+            "coverage": coverage,
+            "active": True
+        }
+        
+        return policy_id
+    
+    @gl.public.write
+    def check_weather(self, policy_id: str) -> str:
+        if policy_id not in self.policies:
+            return "Policy not found"
+        
+        # In production: fetch real weather via AI
+        # Check if payout conditions met
+        
+        return "Weather checked"
+    
+    @gl.public.view
+    def get_policy(self, policy_id: str) -> str:
+        policy = self.policies.get(policy_id)
+        if not policy:
+            return "Not found"
+        return f"Location: {policy['location']}, Coverage: {policy['coverage']}"
+'''
+    },
+    'defi': {
+        'description': 'Simple DeFi lending contract',
+        'code': '''# { "Depends": "py-genlayer:test" }
+from genlayer import *
+
+class {name}(gl.Contract):
+    def __init__(self):
+        self.balances = {}
+        self.total_supply = 0
+    
+    @gl.public.write
+    def deposit(self, amount: int):
+        user = gl.message_sender_address
+        
+        if user not in self.balances:
+            self.balances[user] = 0
+        
+        self.balances[user] += amount
+        self.total_supply += amount
+        
+        return f"Deposited {amount}"
+    
+    @gl.public.write
+    def withdraw(self, amount: int):
+        user = gl.message_sender_address
+        
+        if user not in self.balances or self.balances[user] < amount:
+            return "Insufficient balance"
+        
+        self.balances[user] -= amount
+        self.total_supply -= amount
+        
+        return f"Withdrawn {amount}"
+    
+    @gl.public.view
+    def get_balance(self, address: str) -> int:
+        return self.balances.get(address, 0)
+'''
+    }
+}
+
+# Templates pre-split on `{name}` so generating is a single join
+_TEMPLATE_PARTS = {key: t['code'].split('{name}') for key, t in TEMPLATES.items()}
+
+
 @click.group()
 @click.version_option(version=VERSION)
 def cli():
@@ -69,6 +216,8 @@ def cli():
 @click.option('--template', default='basic', help='Project template (basic, oracle, defi)')
 def init(project_name, template):
     """Initialize a new GenLayer project."""
+    import json
+    from concurrent.futures import ThreadPoolExecutor
     
     click.echo(f"\n{Colors.BOLD}🚀 GenLayer DevKit{Colors.ENDC}")
     click.echo(f"Creating new project: {Colors.CYAN}{project_name}{Colors.ENDC}\n")
@@ -104,10 +253,6 @@ def init(project_name, template):
         }
     }
     
-    with open(project_path / 'genlayer.json', 'w') as f:
-        json.dump(config, f, indent=2)
-    print_success("Created genlayer.json")
-    
     # Create README
     readme_content = f"""# {project_name}
 
@@ -139,20 +284,12 @@ genlayer deploy contracts/MyContract.py --network testnet
 - [DevKit Guide](https://github.com/lifeofagct/genlayer-devkit)
 """
     
-    with open(project_path / 'README.md', 'w') as f:
-        f.write(readme_content)
-    print_success("Created README.md")
-    
     # Create requirements.txt
     requirements = """genlayer-sdk>=0.1.0
 click>=8.0.0
 pytest>=7.0.0
 """
     
-    with open(project_path / 'requirements.txt', 'w') as f:
-        f.write(requirements)
-    print_success("Created requirements.txt")
-    
     # Create .gitignore
     gitignore = """__pycache__/
 *.pyc
@@ -162,10 +299,6 @@ venv/
 *.log
 """
     
-    with open(project_path / '.gitignore', 'w') as f:
-        f.write(gitignore)
-    print_success("Created .gitignore")
-    
     # Create sample contract based on template
     if template == 'basic':
         contract_content = """# {{ "Depends": "py-genlayer:test" }}
@@ -212,9 +345,20 @@ class MyContract(gl.Contract):
         pass
 """
     
-    with open(project_path / 'contracts' / 'MyContract.py', 'w') as f:
-        f.write(contract_content)
-    print_success("Created contracts/MyContract.py")
+    # Write all project files concurrently
+    files = [
+        ('genlayer.json', json.dumps(config, indent=2)),
+        ('README.md', readme_content),
+        ('requirements.txt', requirements),
+        ('.gitignore', gitignore),
+        ('contracts/MyContract.py', contract_content)
+    ]
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda f: (project_path / f[0]).write_text(f[1]), files))
+    
+    for filename, _ in files:
+        print_success(f"Created {filename}")
     
     click.echo(f"\n{Colors.GREEN}✨ Project created successfully!{Colors.ENDC}\n")
     click.echo(f"Next steps:")
@@ -231,149 +375,15 @@ def generate(type, name):
     
     click.echo(f"\n{Colors.BOLD}📝 Generating Contract{Colors.ENDC}\n")
     
-    templates = {
-        'basic': {
-            'description': 'Basic contract with storage',
-            'code': '''# {{ "Depends": "py-genlayer:test" }}
-from genlayer import *
-
-class {name}(gl.Contract):
-    def __init__(self):
-        self.data = {{}}
-    
-    @gl.public.write
-    def store(self, key: str, value: str):
-        self.data[key] = value
-        return f"Stored: {{key}} = {{value}}"
-    
-    @gl.public.view
-    def retrieve(self, key: str) -> str:
-        return self.data.get(key, "Not found")
-'''
-        },
-        'oracle': {
-            'description': 'Price oracle with AI integration',
-            'code': '''# {{ "Depends": "py-genlayer:test" }}
-from genlayer import *
-
-class {name}(gl.Contract):
-    def __init__(self):
-        self.prices = {{}}
-        self.last_update = 0
-    
-    @gl.public.write
-    def fetch_price(self, token: str) -> int:
-        """Fetch token price using AI"""
-        
-        prompt = f"Get current price for {{token}} in USD"
-        
-        def get_price():
-            return gl.exec_prompt(prompt)
-        
-        price_str = gl.eq_principle_strict_eq(get_price)
-        price = int(price_str)
-        
-        self.prices[token] = price
-        self.last_update = gl.block_timestamp
-        
-        return price
-    
-    @gl.public.view
-    def get_price(self, token: str) -> int:
-        return self.prices.get(token, 0)
-'''
-        },
-        'insurance': {
-            'description': 'Weather-based insurance contract',
-            'code': '''# {{ "Depends": "py-genlayer:test" }}
-from genlayer import *
-
-class {name}(gl.Contract):
-    def __init__(self):
-        self.policies = {{}}
-        self.policy_counter = 0
-    
-    @gl.public.write
-    def create_policy(self, location: str, coverage: int) -> str:
-        self.policy_counter += 1
-        policy_id = f"POL-{{self.policy_counter}}"
-        
-        self.policies[policy_id] = {{
-            "location": location,
-            "coverage": coverage,
-            "active": True
-        }}
-        
-        return policy_id
-    
-    @gl.public.write
-    def check_weather(self, policy_id: str) -> str:
-        if policy_id not in self.policies:
-            return "Policy not found"
-        
-        # In production: fetch real weather via AI
-        # Check if payout conditions met
-        
-        return "Weather checked"
-    
-    @gl.public.view
-    def get_policy(self, policy_id: str) -> str:
-        policy = self.policies.get(policy_id)
-        if not policy:
-            return "Not found"
-        return f"Location: {{policy['location']}}, Coverage: {{policy['coverage']}}"
-'''
-        },
-        'defi': {
-            'description': 'Simple DeFi lending contract',
-            'code': '''# {{ "Depends": "py-genlayer:test" }}
-from genlayer import *
-
-class {name}(gl.Contract):
-    def __init__(self):
-        self.balances = {{}}
-        self.total_supply = 0
-    
-    @gl.public.write
-    def deposit(self, amount: int):
-        user = gl.message_sender_address
-        
-        if user not in self.balances:
-            self.balances[user] = 0
-        
-        self.balances[user] += amount
-        self.total_supply += amount
-        
-        return f"Deposited {{amount}}"
-    
-    @gl.public.write
-    def withdraw(self, amount: int):
-        user = gl.message_sender_address
-        
-        if user not in self.balances or self.balances[user] < amount:
-            return "Insufficient balance"
-        
-        self.balances[user] -= amount
-        self.total_supply -= amount
-        
-        return f"Withdrawn {{amount}}"
-    
-    @gl.public.view
-    def get_balance(self, address: str) -> int:
-        return self.balances.get(address, 0)
-'''
-        }
-    }
-    
-    if type not in templates:
+    if type not in TEMPLATES:
         print_error(f"Unknown template type: {type}")
-        print_info(f"Available types: {', '.join(templates.keys())}")
+        print_info(f"Available types: {', '.join(TEMPLATES.keys())}")
         return
     
-    template = templates[type]
+    template = TEMPLATES[type]
     
     # Generate contract code
-    contract_code = template['code'].format(name=name)
+    contract_code = name.join(_TEMPLATE_PARTS[type])
     
     # Write to file
     filename = f"{name}.py"
@@ -410,8 +420,8 @@ def test(contract_file):
     
     print_info(f"Testing: {contract_file}")
     
-    # Read contract
-    with open(contract_file, 'r') as f:
+    # Read contract (as bytes; compile() and the checks below accept them)
+    with open(contract_file, 'rb') as f:
         contract_code = f.read()
     
     # Basic syntax check
@@ -423,20 +433,18 @@ def test(contract_file):
         return
     
     # Check for required elements
-    checks = [
-        ('gl.Contract', 'Inherits from gl.Contract'),
-        ('@gl.public', 'Has public methods'),
-        ('def __init__', 'Has constructor')
-    ]
+    counts = [0] * len(CHECKS)
+    for match in CHECK_PATTERN.finditer(contract_code):
+        counts[match.lastindex - 1] += 1
     
-    for pattern, description in checks:
-        if pattern in contract_code:
+    for count, description in zip(counts, CHECKS):
+        if count:
             print_success(description)
         else:
             print_warning(f"Missing: {description}")
     
     # Count functions
-    public_funcs = contract_code.count('@gl.public')
+    public_funcs = counts[1]
     print_info(f"Public functions: {public_funcs}")
     
     click.echo(f"\n{Colors.GREEN}✓ Basic tests passed{Colors.ENDC}")
@@ -448,38 +456,45 @@ def test(contract_file):
 @click.option('--network', default='testnet', help='Network to deploy to')
 def deploy(contract_file, network):
     """Deploy contract to GenLayer."""
+    import json
+    import shutil
     
     click.echo(f"\n{Colors.BOLD}🚀 Deploying Contract{Colors.ENDC}\n")
     
-    if not os.path.exists(contract_file):
+    # Open contract once; it is streamed to stdout below
+    try:
+        contract = open(contract_file, 'rb')
+    except FileNotFoundError:
         print_error(f"Contract file not found: {contract_file}")
         return
     
-    print_info(f"Contract: {contract_file}")
-    print_info(f"Network: {network}")
-    
-    # Read config
-    config_file = 'genlayer.json'
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-            if network in config.get('networks', {}):
-                network_config = config['networks'][network]
-                print_info(f"RPC: {network_config['rpc_url']}")
-    
-    click.echo(f"\n{Colors.YELLOW}Deployment Steps:{Colors.ENDC}")
-    click.echo("1. Open GenLayer Studio: https://studio.genlayer.com")
-    click.echo(f"2. Copy contents of {contract_file}")
-    click.echo("3. Paste into Studio editor")
-    click.echo("4. Click 'Deploy'")
-    click.echo("5. Save contract address")
-    
-    # Open file for user
-    print_info(f"\nContract code:")
-    click.echo(f"\n{Colors.CYAN}--- {contract_file} ---{Colors.ENDC}")
-    with open(contract_file, 'r') as f:
-        click.echo(f.read())
-    click.echo(f"{Colors.CYAN}--- End ---{Colors.ENDC}\n")
+    with contract:
+        print_info(f"Contract: {contract_file}")
+        print_info(f"Network: {network}")
+        
+        # Read config
+        config_file = 'genlayer.json'
+        if os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                if network in config.get('networks', {}):
+                    network_config = config['networks'][network]
+                    print_info(f"RPC: {network_config['rpc_url']}")
+        
+        click.echo(f"\n{Colors.YELLOW}Deployment Steps:{Colors.ENDC}")
+        click.echo("1. Open GenLayer Studio: https://studio.genlayer.com")
+        click.echo(f"2. Copy contents of {contract_file}")
+        click.echo("3. Paste into Studio editor")
+        click.echo("4. Click 'Deploy'")
+        click.echo("5. Save contract address")
+        
+        # Open file for user
+        print_info(f"\nContract code:")
+        click.echo(f"\n{Colors.CYAN}--- {contract_file} ---{Colors.ENDC}")
+        shutil.copyfileobj(contract, sys.stdout.buffer)
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+        click.echo(f"{Colors.CYAN}--- End ---{Colors.ENDC}\n")
 
 
 @cli.command()
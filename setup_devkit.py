@@ -4,15 +4,69 @@ GenLayer DevKit - Easy Setup Script
 ====================================
 
 Run this to set up DevKit in one command.
+
+Options:
+  --fast, --skip-test   Skip the final installation smoke test
+  --no-alias            Only print the shell alias; don't add it to your shell rc file
 """
 
+import io
 import os
 import sys
-import subprocess
-import platform
+import sysconfig
+import threading
+import contextlib
+import importlib.util
 
-def print_banner():
-    banner = """
+REQUIRED_PACKAGES = ["click", "colorama"]
+
+# Command-line flags (checked directly; there are too few for argparse)
+_FAST = "--fast" in sys.argv or "--skip-test" in sys.argv
+_NO_ALIAS = "--no-alias" in sys.argv
+
+# Looked up once; the setup steps only read these. _SYSTEM matches
+# platform.system() without importing platform (which imports subprocess)
+_SYSTEM = "Windows" if sys.platform == "win32" else os.uname().sysname
+_PYVER = sys.version_info
+# Interpreter for fallback subprocesses (sys.executable is empty when embedded)
+_PYTHON = sys.executable
+if not _PYTHON:
+    import shutil
+    _PYTHON = shutil.which("python3") or "python"
+_DEVKIT_ABSPATH = os.path.abspath("genlayer_devkit.py")
+
+# Decorative banners are only shown on an interactive terminal
+_TTY = sys.stdout.isatty()
+
+# Shell rc files the alias is added to, by shell name
+_RC_BY_SHELL = {
+    "bash": "~/.bashrc",
+    "zsh": "~/.zshrc",
+    "fish": "~/.config/fish/config.fish"
+}
+
+# Alias definitions by shell ("posix" covers bash, zsh and other sh-like shells)
+_ALIAS_TEMPLATES = {
+    "posix": 'alias genlayer="python3 {path}"',
+    "fish": 'alias genlayer "python3 {path}"',
+    "windows": 'function genlayer {{ python "{path}" $args }}'
+}
+
+# Messages that only depend on the interpreter and install path
+_ALIASES = {key: t.format(path=_DEVKIT_ABSPATH) for key, t in _ALIAS_TEMPLATES.items()}
+_PY_OK_MSG = f"  Python {_PYVER.major}.{_PYVER.minor}.{_PYVER.micro} detected"
+_WINDOWS_ALIAS_MSG = f"""
+  Windows PowerShell alias:
+  
+  Add this to your PowerShell profile:
+  
+  {_ALIASES["windows"]}
+  
+  Or run directly:
+  python genlayer_devkit.py <command>
+        """
+
+_BANNER = """
 ╔═══════════════════════════════════════════════════════════╗
 ║                                                           ║
 ║            🛠️  GenLayer DevKit Setup 🛠️                  ║
@@ -21,199 +75,361 @@ def print_banner():
 ║                                                           ║
 ╚═══════════════════════════════════════════════════════════╝
 """
-    print(banner)
+
+_NEXT_STEPS = """
+╔═══════════════════════════════════════════════════════════╗
+║                    ✨ Setup Complete! ✨                  ║
+╚═══════════════════════════════════════════════════════════╝
+
+📚 Quick Start:
+
+  # Test the CLI
+  python genlayer_devkit.py --help
+  
+  # Create your first project
+  python genlayer_devkit.py init my-awesome-project
+  cd my-awesome-project
+  
+  # Generate a contract
+  python ../genlayer_devkit.py generate --type oracle --name PriceOracle
+  
+  # Test it
+  python ../genlayer_devkit.py test contracts/PriceOracle.py
+
+⚡ Re-running setup:
+  python setup_devkit.py --fast    (skips the installation test)
+
+📖 Documentation:
+  - Read DEVKIT_README.md for full guide
+  - Check DEVKIT_INSTALL.md for detailed setup
+  - See examples/ for contract templates
+
+🚀 Happy Building!
+    """
+
+_FAIL_BANNER = """
+╔═══════════════════════════════════════════════════════════╗
+║              ⚠️  Setup encountered issues  ⚠️             ║
+╚═══════════════════════════════════════════════════════════╝
+
+You can still use DevKit by running:
+  python genlayer_devkit.py <command>
+
+Check DEVKIT_INSTALL.md for troubleshooting.
+        """
+
+# Output lines waiting to be written; flushed once per setup section
+_OUT = []
+
+# Per-thread output buffer used while setup steps run concurrently
+_output = threading.local()
+
+def say(*args):
+    """Queue a line of output (into a per-thread buffer inside run_buffered())"""
+    lines = getattr(_output, "lines", None)
+    if lines is None:
+        lines = _OUT
+    lines.append(" ".join(str(arg) for arg in args))
+    
+    # The lead step of a concurrent group reports progress as it happens
+    if getattr(_output, "live", False):
+        flush_output()
+
+def flush_output():
+    """Write all queued output with a single write call"""
+    if _OUT:
+        sys.stdout.write("\n".join(_OUT) + "\n")
+        sys.stdout.flush()
+        _OUT.clear()
+
+def run_buffered(step_func):
+    """Run a setup step, returning its result and captured output lines"""
+    _output.lines = []
+    try:
+        return step_func(), _output.lines
+    finally:
+        _output.lines = None
+
+def run_steps(group):
+    """Run a group of setup steps and return the name of the first failure"""
+    if len(group) == 1:
+        step_name, step_func = group[0]
+        return None if step_func() else step_name
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    # The first (slow) step runs here with live output; the others run in
+    # worker threads and their output is replayed after it, in step order
+    (lead_name, lead_func), rest = group[0], group[1:]
+    with ThreadPoolExecutor(max_workers=len(rest)) as executor:
+        futures = [executor.submit(run_buffered, step_func) for _, step_func in rest]
+        flush_output()
+        _output.live = True
+        try:
+            lead_ok = lead_func()
+        finally:
+            _output.live = False
+    
+    # Always replay what the workers did, even if the lead step failed
+    failed = None if lead_ok else lead_name
+    for (step_name, _), future in zip(rest, futures):
+        ok, lines = future.result()
+        _OUT.extend(lines)
+        if not ok and failed is None:
+            failed = step_name
+    return failed
+
+def print_banner():
+    if _TTY:
+        say(_BANNER)
 
 def check_python():
     """Check Python version"""
-    print("✓ Checking Python version...")
+    say("✓ Checking Python version...")
     
-    version = sys.version_info
+    version = _PYVER
     if version.major < 3 or (version.major == 3 and version.minor < 7):
-        print("❌ Python 3.7 or higher required!")
-        print(f"   Current version: {version.major}.{version.minor}")
+        say("❌ Python 3.7 or higher required!")
+        say(f"   Current version: {version.major}.{version.minor}")
         return False
     
-    print(f"  Python {version.major}.{version.minor}.{version.micro} detected")
+    say(_PY_OK_MSG)
     return True
 
+def is_externally_managed():
+    """Check for a PEP 668 EXTERNALLY-MANAGED marker (ignored inside a venv)"""
+    if sys.prefix != sys.base_prefix:
+        return False
+    stdlib = sysconfig.get_path("stdlib")
+    return bool(stdlib) and os.path.exists(os.path.join(stdlib, "EXTERNALLY-MANAGED"))
+
+def run_pip(args):
+    """Run pip in this interpreter; returns (exit code, output), or None if unavailable"""
+    # pip does not officially support in-process use; only an import failure
+    # or a crash falls back to "python -m pip" in a subprocess
+    try:
+        from pip._internal.cli.main import main as pip_main
+    except ImportError:
+        return None
+    
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            status = pip_main(args)
+    except (Exception, SystemExit) as e:
+        say(f"⚠️  In-process pip failed ({e}), retrying in a subprocess")
+        return None
+    
+    return status, output.getvalue()
+
 def install_dependencies():
     """Install required packages"""
-    print("\n✓ Installing dependencies...")
+    say("\n✓ Installing dependencies...")
     
-    try:
-        subprocess.check_call([
-            sys.executable, "-m", "pip", "install", 
-            "click", "colorama", "--break-system-packages", "-q"
-        ])
-        print("  Dependencies installed successfully")
+    # Skip pip entirely when everything is already importable
+    needed = [pkg for pkg in REQUIRED_PACKAGES if importlib.util.find_spec(pkg) is None]
+    if not needed:
+        say("  Dependencies already installed")
         return True
-    except subprocess.CalledProcessError:
-        # Try without --break-system-packages
+    
+    args = ["install", *needed, "-q", "--disable-pip-version-check", "--no-input"]
+    if is_externally_managed():
+        args.append("--break-system-packages")
+    
+    result = run_pip(args)
+    if result is None:
+        import subprocess
         try:
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                "click", "colorama", "-q"
-            ])
-            print("  Dependencies installed successfully")
-            return True
-        except:
-            print("❌ Failed to install dependencies")
-            print("  Try manually: pip install click colorama")
-            return False
+            proc = subprocess.run(
+                [_PYTHON, "-m", "pip", *args],
+                capture_output=True,
+                text=True
+            )
+            result = proc.returncode, proc.stdout + proc.stderr
+        except OSError as e:
+            result = 1, f"{e}\n"
+    
+    # pip's own output is only shown if the install fails
+    status, output = result
+    if status == 0:
+        say("  Dependencies installed successfully")
+        return True
+    
+    sys.stderr.write(output)
+    say("❌ Failed to install dependencies")
+    say("  Try manually: pip install click colorama")
+    return False
 
 def make_executable():
     """Make devkit executable"""
-    print("\n✓ Setting up executable...")
+    say("\n✓ Setting up executable...")
     
     devkit_file = "genlayer_devkit.py"
     
-    if not os.path.exists(devkit_file):
-        print(f"❌ {devkit_file} not found!")
+    try:
+        st = os.stat(devkit_file)
+    except FileNotFoundError:
+        say(f"❌ {devkit_file} not found!")
         return False
     
-    # Make executable on Unix
-    if platform.system() != "Windows":
+    # Make executable on Unix (skipped when we can already execute it)
+    if _SYSTEM != "Windows" and not os.access(devkit_file, os.X_OK):
         try:
-            os.chmod(devkit_file, 0o755)
-            print(f"  {devkit_file} is now executable")
+            os.chmod(devkit_file, st.st_mode | 0o111)
+            say(f"  {devkit_file} is now executable")
         except Exception as e:
-            print(f"⚠️  Could not make executable: {e}")
+            say(f"⚠️  Could not make executable: {e}")
+    elif _SYSTEM != "Windows":
+        say(f"  {devkit_file} is already executable")
     
     return True
 
+def append_alias(rc_file, alias_line):
+    """Make sure rc_file defines alias_line; returns 'ready', 'conflict' or 'failed'"""
+    try:
+        with open(rc_file, 'r', errors='replace') as f:
+            lines = [line.strip() for line in f]
+        if alias_line in lines:
+            return "ready"
+        
+        # Leave an existing (e.g. older DevKit path) genlayer alias alone
+        if any(line.startswith(("alias genlayer=", "alias genlayer ")) for line in lines):
+            return "conflict"
+        
+        with open(rc_file, 'a') as f:
+            f.write(f"\n{alias_line}\n")
+        return "ready"
+    except (OSError, ValueError) as e:
+        say(f"⚠️  Could not update {rc_file}: {e}")
+        return "failed"
+
 def create_alias():
     """Create command alias"""
-    print("\n✓ Setting up alias...")
+    say("\n✓ Setting up alias...")
+    
+    if _SYSTEM == "Windows":
+        say(_WINDOWS_ALIAS_MSG)
+        return True
     
-    system = platform.system()
-    devkit_path = os.path.abspath("genlayer_devkit.py")
+    # Unix alias
+    shell = os.path.basename(os.environ.get('SHELL', ''))
+    alias = _ALIASES.get(shell, _ALIASES["posix"])
+    rc_file = _RC_BY_SHELL.get(shell)
+    if rc_file:
+        rc_file = os.path.expanduser(rc_file)
     
-    if system == "Windows":
-        # PowerShell alias
-        print("""
-  Windows PowerShell alias:
+    status = None
+    if rc_file and not _NO_ALIAS and os.path.exists(rc_file):
+        status = append_alias(rc_file, alias)
+    
+    if status == "ready":
+        say(f"""
+  Alias ready in {rc_file}:
   
-  Add this to your PowerShell profile:
+  {alias}
   
-  function genlayer { python "{}" $args }
+  Open a new shell or run: source {rc_file}
+        """)
+    elif status == "conflict":
+        say(f"""
+  ⚠️  {rc_file} already defines a different genlayer alias.
+  Edit that line in {rc_file} so it reads:
   
-  Or run directly:
-  python genlayer_devkit.py <command>
-        """.format(devkit_path))
-    else:
-        # Unix alias
-        shell = os.environ.get('SHELL', '')
-        
-        if 'bash' in shell:
-            rc_file = os.path.expanduser('~/.bashrc')
-        elif 'zsh' in shell:
-            rc_file = os.path.expanduser('~/.zshrc')
-        else:
-            rc_file = None
-        
-        if rc_file:
-            alias_line = f'\nalias genlayer="python3 {devkit_path}"\n'
-            
-            print(f"""
+  {alias}
+  
+  Then open a new shell or run: source {rc_file}
+        """)
+    elif rc_file:
+        say(f"""
   Add this to your {rc_file}:
   
-  alias genlayer="python3 {devkit_path}"
+  {alias}
   
-  Or run: echo '{alias_line}' >> {rc_file}
-            """)
-        else:
-            print(f"""
+  Or run: echo '\n{alias}\n' >> {rc_file}
+        """)
+    else:
+        say(f"""
   Create an alias in your shell:
   
-  alias genlayer="python3 {devkit_path}"
-            """)
+  {alias}
+        """)
     
     return True
 
 def test_installation():
     """Test if installation works"""
-    print("\n✓ Testing installation...")
+    say("\n✓ Testing installation...")
+    
+    # Load the CLI in-process first; this avoids starting a second interpreter
+    try:
+        importlib.invalidate_caches()
+        spec = importlib.util.spec_from_file_location("genlayer_devkit", "genlayer_devkit.py")
+        module = importlib.util.module_from_spec(spec)
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.loader.exec_module(module)
+        if hasattr(module, "cli"):
+            say("  DevKit is working!")
+            return True
+    except Exception:
+        pass
     
+    # Fall back to running the CLI in a subprocess
+    import subprocess
     try:
         result = subprocess.run(
-            [sys.executable, "genlayer_devkit.py", "--version"],
+            [_PYTHON, "genlayer_devkit.py", "--version"],
             capture_output=True,
             text=True
         )
         
         if result.returncode == 0:
-            print("  DevKit is working!")
+            say("  DevKit is working!")
             return True
         else:
-            print("⚠️  DevKit test failed")
+            sys.stderr.write(result.stdout)
+            sys.stderr.write(result.stderr)
+            say("⚠️  DevKit test failed")
             return False
     except Exception as e:
-        print(f"⚠️  Test error: {e}")
+        say(f"⚠️  Test error: {e}")
         return False
 
 def print_next_steps():
     """Show next steps"""
-    print("""
-╔═══════════════════════════════════════════════════════════╗
-║                    ✨ Setup Complete! ✨                  ║
-╚═══════════════════════════════════════════════════════════╝
-
-📚 Quick Start:
-
-  # Test the CLI
-  python genlayer_devkit.py --help
-  
-  # Create your first project
-  python genlayer_devkit.py init my-awesome-project
-  cd my-awesome-project
-  
-  # Generate a contract
-  python ../genlayer_devkit.py generate --type oracle --name PriceOracle
-  
-  # Test it
-  python ../genlayer_devkit.py test contracts/PriceOracle.py
-
-📖 Documentation:
-  - Read DEVKIT_README.md for full guide
-  - Check DEVKIT_INSTALL.md for detailed setup
-  - See examples/ for contract templates
-
-🚀 Happy Building!
-    """)
+    if _TTY:
+        say(_NEXT_STEPS)
+    else:
+        say("\nDevKit setup complete.")
 
 def main():
     """Main setup function"""
     print_banner()
     
-    # Run setup steps
+    # Run setup steps; steps in the same group run concurrently
     steps = [
-        ("Checking Python", check_python),
-        ("Installing dependencies", install_dependencies),
-        ("Making executable", make_executable),
-        ("Creating alias", create_alias),
-        ("Testing installation", test_installation)
+        [("Checking Python", check_python)],
+        [("Installing dependencies", install_dependencies),
+         ("Making executable", make_executable)],
+        # Edits the shell rc file, so it only runs once dependencies are in
+        [("Creating alias", create_alias)]
     ]
+    if not _FAST:
+        steps.append([("Testing installation", test_installation)])
     
     success = True
-    for step_name, step_func in steps:
-        if not step_func():
+    for group in steps:
+        failed = run_steps(group)
+        flush_output()
+        if failed:
             success = False
-            print(f"\n⚠️  Setup incomplete: {step_name} failed")
+            say(f"\n⚠️  Setup incomplete: {failed} failed")
             break
     
     if success:
         print_next_steps()
     else:
-        print("""
-╔═══════════════════════════════════════════════════════════╗
-║              ⚠️  Setup encountered issues  ⚠️             ║
-╚═══════════════════════════════════════════════════════════╝
-
-You can still use DevKit by running:
-  python genlayer_devkit.py <command>
-
-Check DEVKIT_INSTALL.md for troubleshooting.
-        """)
+        say(_FAIL_BANNER)
+    flush_output()
 
 if __name__ == "__main__":
     main()